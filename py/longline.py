@@ -1,5 +1,6 @@
 #!/usr/bin/python
 
+import heapq
 import sys
 from optparse import OptionParser
 
@@ -8,47 +9,70 @@ def read_options():
     parser = OptionParser(usage)
     parser.add_option("-f", "--file", dest="inputfile", help="the downloaded html source")
     parser.add_option("-l", "--bylength", dest="sortbylength", default=False, action="store_true", help="sort by line length ascending")
+    parser.add_option("-t", "--top", dest="top", type="int", default=None, help="with -l, only show the N shortest lines")
     (op, args) = parser.parse_args()
     if not op.inputfile:
         parser.error("missing required option; -h for help")
     return op
 
+def scan_lines(data):
+    """
+    Given the file contents as bytes, return (starts, lengths, longest)
+    where starts[i]/lengths[i] locate line i in the buffer (newline
+    included, like readlines) and longest is the index of the longest
+    line. Vectorized with numpy when it is available; plain find() loop
+    otherwise.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    if np is not None and data:
+        buf = np.frombuffer(data, np.uint8)
+        ends = np.nonzero(buf == 0x0A)[0]
+        if data[-1] != 0x0A:
+            ends = np.concatenate((ends, [len(data) - 1]))
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        lengths = ends - starts + 1
+        return starts.tolist(), lengths.tolist(), int(np.argmax(lengths))
+
+    starts = []
+    lengths = []
+    longest = 0
+    pos = 0
+    while pos < len(data):
+        nl = data.find(b"\n", pos)
+        end = (len(data) - 1) if nl < 0 else nl
+        starts.append(pos)
+        lengths.append(end - pos + 1)
+        if lengths[-1] > lengths[longest]:
+            longest = len(lengths) - 1
+        pos = end + 1
+    return starts, lengths, longest
+
 if __name__ == "__main__":
-    
+
     op = read_options()
-    f = open(op.inputfile, "r")
-    
-    data = f.readlines()
-    
-    by_length = {}
-    
-    i = 0
-    longest_len = 0
-    longest_line = 0
-    longest_content = None
-    for lyne in data:
-        i += 1
-        current_len = len(lyne)
-        lynes = by_length.get(current_len, [])
-        lynes.append(lyne)
-        by_length[current_len] = lynes
-        
-        if (current_len > longest_len):
-            longest_len = current_len
-            longest_line = i
-            longest_content = lyne
-        if not op.sortbylength:
-            print("#%s (%s)" % (i, current_len))
-            
+    with open(op.inputfile, "rb") as f:
+        data = f.read()
+
+    starts, lengths, longest = scan_lines(data)
+
+    def line_at(i):
+        return data[starts[i]:starts[i] + lengths[i]].decode(errors="replace")
+
     if op.sortbylength:
-        i = 0
-        for lyne_length in sorted(by_length.keys()):
-            for lyne in by_length.get(lyne_length):
-                i += 1
-                print("(%d) %s%s" % (lyne_length, lyne[:80], (len(lyne) > 80) and "..." or ""))
-                
-    if not op.sortbylength:
-        print
-        print("Longest line: #%s (%s):\n %s" % (longest_line, longest_len, longest_content))
-    f.close()
-    
\ No newline at end of file
+        if op.top:
+            # a bounded heap instead of sorting (and keeping) every line
+            order = heapq.nsmallest(op.top, range(len(lengths)), key=lengths.__getitem__)
+        else:
+            order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        for i in order:
+            lyne = line_at(i)
+            print("(%d) %s%s" % (lengths[i], lyne[:80], (len(lyne) > 80) and "..." or ""))
+    else:
+        for i, current_len in enumerate(lengths):
+            print("#%s (%s)" % (i + 1, current_len))
+        if lengths:
+            print("Longest line: #%s (%s):\n %s" % (longest + 1, lengths[longest], line_at(longest)))
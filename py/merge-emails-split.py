@@ -1,4 +1,5 @@
 import sys
+from itertools import islice
 
 """
 this splits a file of the format:
@@ -12,9 +13,6 @@ into several chunks of a relatively fixed size, but keeps
 records with the same email addresses in the same chunk
 """
 
-def email_of(lyne):
-    return lyne.split(",")[3]
-
 def split(args):
     if len(args) < 4:
         print("Usage:\npython %s {filename} {chunk_size} {prefix} [{ext}]" % args[0])
@@ -29,24 +27,31 @@ def split(args):
         ext = None
     chunk_count = 0
     with open(filename) as f:
-        chunk = []
-        all_lines = [ln.strip() for ln in f.readlines()]
-        while len(all_lines) > 0:
-            if len(all_lines) <= chunk_size:
-                n = len(all_lines)
-            else:
-                n = chunk_size
-                while n < len(all_lines) and email_of(all_lines[n]) == email_of(all_lines[n-1]):
-                    n += 1
-
-            chunk_count += 1
-            chunk_fn = "%s%s.%s" % (prefix, chunk_count, ext or "")
-            with open(chunk_fn, 'w') as fc:
-                for outline in all_lines[0:n]:
-                    fc.write("%s\n" % outline)
-            print(chunk_fn)
-
-            all_lines = all_lines[n:]
+        all_lines = [ln.strip() for ln in f]
+
+    # the email column, extracted once per line; the maxsplit cap stops
+    # the split after the comma that ends the email field
+    emails = [ln.split(",", 4)[3] for ln in all_lines]
+
+    total = len(all_lines)
+    pos = 0
+    while pos < total:
+        remaining = total - pos
+        if remaining <= chunk_size:
+            n = remaining
+        else:
+            n = chunk_size
+            while n < remaining and emails[pos+n] == emails[pos+n-1]:
+                n += 1
+
+        chunk_count += 1
+        chunk_fn = "%s%s.%s" % (prefix, chunk_count, ext or "")
+        with open(chunk_fn, 'w') as fc:
+            for outline in islice(all_lines, pos, pos + n):
+                fc.write("%s\n" % outline)
+        print(chunk_fn)
+
+        pos += n
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+
+"""
+Encodes a (store, sequence) pair into a short obfuscated code
+and decodes it back, shifting and repositioning the base-27 digits
+so consecutive sequence numbers do not produce look-alike codes.
+
+Run over a range of stores and sequences to verify that every
+code round-trips:
+
+python revcode.py {store_start} {store_end} {seq_start} {seq_end} [-v]
+"""
+
+import sys
+
+ALPHABET = "ABCDEFGHJKMNPQRSTUVWXYZ2345"
+NUM_CHARS = len(ALPHABET)
+STORE_SIZE = 4
+SEQUENCE_SIZE = 8
+MOD_BY = 9
+
+# precomputed once at import: powers of the alphabet size and the
+# reverse character lookup, so the per-digit work inside encode/decode
+# is tuple indexing and a dict lookup instead of pow() and .index()
+POWERS = tuple(NUM_CHARS**p for p in range(max(STORE_SIZE, SEQUENCE_SIZE) + 1))
+CHAR_TO_IDX = {c: i for i, c in enumerate(ALPHABET)}
+
+# rebound to numba.prange in main when numba is installed
+prange = range
+
+
+def _specialize_encode(pad):
+    """
+    exec() an encode variant for a fixed pad with the digit loop unrolled
+    and the powers baked in as integer literals.
+    """
+    lines = ["def _encode_%d(num, shift):" % pad]
+    for power in range(pad):
+        lines.append("    c%d = ALPHABET[((num // %d) %% %d + shift + %d) %% %d]"
+                     % (power, POWERS[power], NUM_CHARS, power, NUM_CHARS))
+    lines.append("    return " + " + ".join("c%d" % p for p in range(pad - 1, -1, -1)))
+    namespace = {"ALPHABET": ALPHABET}
+    exec("\n".join(lines), namespace)
+    return namespace["_encode_%d" % pad]
+
+
+def _specialize_decode(pad):
+    """
+    The matching unrolled decode: one term per character position.
+    """
+    lines = ["def _decode_%d(code, shift):" % pad]
+    terms = ["((CHAR_TO_IDX[code[%d]] - shift - %d) %% %d) * %d"
+             % (pad - 1 - i, i, NUM_CHARS, POWERS[i]) for i in range(pad)]
+    lines.append("    return (" + "\n        + ".join(terms) + ")")
+    namespace = {"CHAR_TO_IDX": CHAR_TO_IDX}
+    exec("\n".join(lines), namespace)
+    return namespace["_decode_%d" % pad]
+
+
+_ENCODERS = {pad: _specialize_encode(pad) for pad in (STORE_SIZE, SEQUENCE_SIZE)}
+_DECODERS = {pad: _specialize_decode(pad) for pad in (STORE_SIZE, SEQUENCE_SIZE)}
+
+
+def encode(num, pad, shift):
+    """
+    Render num as pad base-27 digits, most significant first,
+    with each digit shifted by (shift + its power) around the alphabet.
+    """
+    specialized = _ENCODERS.get(pad)
+    if specialized:
+        return specialized(num, shift)
+    parts = [None] * pad
+    for power in range(pad):
+        digit = (num // POWERS[power]) % NUM_CHARS
+        repositioned = (digit + shift + power) % NUM_CHARS
+        parts[pad - 1 - power] = ALPHABET[repositioned]
+    return "".join(parts)
+
+
+def decode(code, shift):
+    """
+    The inverse of encode: unshift each digit and accumulate.
+    """
+    l = len(code)
+    specialized = _DECODERS.get(l)
+    if specialized:
+        return specialized(code, shift)
+    num = 0
+    for i in range(l):
+        digit = CHAR_TO_IDX[code[l - 1 - i]] - shift - i
+        num += (digit % NUM_CHARS) * POWERS[i]
+    return num
+
+
+def encode_batch(start, end, pad):
+    """
+    Encode every num in [start, end), each with its own shift, and return
+    the list of code strings. The digit extraction is pure elementwise
+    integer math, so with numpy installed each power's digits for the whole
+    range are computed in one vector op and the characters are gathered
+    from the alphabet in one indexing pass.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return [encode(num, pad, num % MOD_BY + 1) for num in range(start, end)]
+
+    nums = np.arange(start, end, dtype=np.int64)
+    shifts = nums % MOD_BY + 1
+    # most significant character first, matching encode()
+    columns = [((nums // POWERS[p]) % NUM_CHARS + shifts + p) % NUM_CHARS
+               for p in range(pad - 1, -1, -1)]
+    indices = np.stack(columns, axis=1).astype(np.uint8)
+    alphabet_arr = np.frombuffer(ALPHABET.encode(), dtype="S1")
+    codes = np.ascontiguousarray(alphabet_arr[indices]).view("S%d" % pad).ravel()
+    return [code.decode() for code in codes]
+
+
+def _sweep(store_start, store_end, seq_start, seq_end):
+    """
+    Round-trip every (store, sequence) pair in the range and count mismatches.
+
+    Works on packed base-27 integers instead of strings so the whole loop is
+    integer arithmetic; numba can JIT-compile it as-is when it is installed.
+
+    Each store is independent, so the outer loop is a prange: under
+    njit(parallel=True) the stores are spread across cores and the errors
+    counter becomes a per-thread reduction. The inner loop stays serial.
+    """
+    errors = 0
+    for store in prange(store_start, store_end):
+        store_shift = store % MOD_BY + 1
+        packed = 0
+        for power in range(STORE_SIZE):
+            digit = (store // POWERS[power]) % NUM_CHARS
+            packed += ((digit + store_shift + power) % NUM_CHARS) * POWERS[power]
+        decoded = 0
+        for power in range(STORE_SIZE):
+            digit = (packed // POWERS[power]) % NUM_CHARS - store_shift - power
+            decoded += (digit % NUM_CHARS) * POWERS[power]
+        if decoded != store:
+            errors += 1
+        for sequence in range(seq_start, seq_end):
+            shift = sequence % MOD_BY + 1
+            packed = 0
+            for power in range(SEQUENCE_SIZE):
+                digit = (sequence // POWERS[power]) % NUM_CHARS
+                packed += ((digit + shift + power) % NUM_CHARS) * POWERS[power]
+            decoded = 0
+            for power in range(SEQUENCE_SIZE):
+                digit = (packed // POWERS[power]) % NUM_CHARS - shift - power
+                decoded += (digit % NUM_CHARS) * POWERS[power]
+            if decoded != sequence:
+                errors += 1
+    return errors
+
+
+def main(args):
+    if len(args) < 5:
+        print("Usage:\npython %s {store_start} {store_end} {seq_start} {seq_end} [-v]" % args[0])
+        sys.exit()
+
+    store_start = int(args[1])
+    store_end = int(args[2])
+    seq_start = int(args[3])
+    seq_end = int(args[4])
+    verbose = len(args) > 5 and args[5] == "-v"
+
+    if verbose:
+        errors = 0
+        # the sequence codes do not depend on the store, so batch-encode
+        # them once up front instead of once per store
+        seq_codes = encode_batch(seq_start, seq_end, SEQUENCE_SIZE)
+        # buffer the verbose output and flush in blocks instead of one
+        # write per code
+        buf = []
+        for store in range(store_start, store_end):
+            store_shift = store % MOD_BY + 1
+            encoded_store = encode(store, STORE_SIZE, store_shift)
+            if decode(encoded_store, store_shift) != store:
+                errors += 1
+                buf.append(f"store mismatch: {store} => {encoded_store}")
+            for sequence, encoded in zip(range(seq_start, seq_end), seq_codes):
+                shift = sequence % MOD_BY + 1
+                decoded = decode(encoded, shift)
+                if decoded != sequence:
+                    errors += 1
+                buf.append(f"{sequence} => {encoded_store}{encoded} => [ {encoded_store} | {encoded} ] [{decoded}]")
+                if len(buf) >= 10000:
+                    sys.stdout.write("\n".join(buf))
+                    sys.stdout.write("\n")
+                    buf.clear()
+        if buf:
+            sys.stdout.write("\n".join(buf))
+            sys.stdout.write("\n")
+    else:
+        try:
+            import numba
+            globals()["prange"] = numba.prange
+            sweep = numba.njit(cache=True, parallel=True)(_sweep)
+        except ImportError:
+            sweep = _sweep
+        errors = sweep(store_start, store_end, seq_start, seq_end)
+
+    print("Checked %d codes, %d errors" % ((store_end - store_start) * (seq_end - seq_start), errors))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,5 +1,9 @@
+import re
 import sys
 
+# all the markers we classify on, matched in one pass per line
+MARKERS = re.compile(r"OK,ok|NO-EMAIL|email:blocked|email:illegal|err:")
+
 if len(sys.argv) < 2:
     print("Usage: %s {consolidated-output-file}" % sys.argv[0])
     sys.exit()
@@ -12,20 +16,21 @@ other = 0
 total = 0
 
 with open(sys.argv[1]) as f:
-    for ln in f.readlines():
+    for ln in f:
         total += 1
-        if "OK,ok" in ln:
-            ok += 1
-        if "NO-EMAIL" in ln:
-            missing += 1
-        if "err:" in ln:
-            if "email:blocked" in ln:
+        hits = set(MARKERS.findall(ln))
+        if "err:" in hits:
+            if "email:blocked" in hits:
                 blk += 1
-            elif "email:illegal" in ln:
+            elif "email:illegal" in hits:
                 ill += 1
             else:
                 print(ln)
                 other += 1
+        elif "OK,ok" in hits:
+            ok += 1
+        elif "NO-EMAIL" in hits:
+            missing += 1
 
 
 print("Total reminder emails scheduled: %s" % total)
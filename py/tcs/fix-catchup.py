@@ -1,32 +1,31 @@
 import sys
 
--- simple data transform to replace the 1st element and null out the 8th
+# simple data transform to replace the 1st element and null out the 8th
 
 if len(sys.argv) < 2:
     print("filename?")
+    sys.exit()
 
 fn = sys.argv[1]
 
-with open('map.txt') as f:
-    mapping = [r.strip() for r in f.readlines()]
-
 xref = {}
-for m in mapping:
-    a = m.split('|')
-    xref[a[0]] = a[1]
+with open('map.txt') as f:
+    for m in f:
+        a = m.strip().split('|')
+        xref[a[0]] = a[1]
 
-header = True
+out = []
 with open(fn) as f:
-    lines = [r.strip() for r in f.readlines()]
-
-for r in lines:
-    if header:
-        print r
-    else:
-        r1 = r.split('|')
-        k = r1[0]
-        v = xref[k]
-        r1[1] = v
+    rows = iter(f)
+    sys.stdout.write(next(rows))
+    for r in rows:
+        r1 = r.strip().split('|')
+        r1[1] = xref[r1[0]]
         r1[8] = ''
-        print("|".join(r1))
-    header = False
+        out.append('|'.join(r1))
+        if len(out) >= 8192:
+            sys.stdout.write('\n'.join(out) + '\n')
+            out.clear()
+
+if out:
+    sys.stdout.write('\n'.join(out) + '\n')
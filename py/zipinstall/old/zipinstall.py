@@ -1,13 +1,14 @@
 #!/usr/bin/env python
 
+import functools
 import os
 import re
+import stat
 import sys
-from argparse import ArgumentParser
-from argparse import RawDescriptionHelpFormatter
-from glob import glob
-from fnmatch import fnmatch
-from zipfile import ZipFile
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate as fnmatch_translate
+import time
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED, ZIP_STORED
 
 VERSION = "1.3.1"
 NAME = "zipinstall"
@@ -21,6 +22,10 @@ Summary:
 """
 
 def read_options():
+    # argparse is only needed for this one call, and its import is a
+    # measurable slice of start-up time; keep it off the module path
+    from argparse import ArgumentParser, RawDescriptionHelpFormatter
+
     help = """
         Generates an install zip file for a DBA. Version %s.
 
@@ -97,21 +102,29 @@ def read_options():
 
     return options
 
+# rebound once after option parsing so hot loops can test a module
+# global instead of dereferencing opts.debug_enabled per call
+_DEBUG = False
+
 def debug(text):
-    if opts.debug_enabled:
+    if _DEBUG:
         print("[DEBUG] %s" % text)
 
 def is_verbose():
     return opts.verbose
 
-def maybe_show(str, always=False):
+def maybe_show(fmt, *args, always=False):
+    # logging-style lazy %: the message is only formatted once the
+    # verbosity check has passed
     if is_verbose() or always:
-        print(str)
+        print(fmt % args if args else fmt)
 
-def show(str):
-    print(str)
+def show(msg):
+    print(msg)
 
+@functools.lru_cache(maxsize=1)
 def cwd_name():
+    # getcwd is a syscall; cache it and clear the cache after any chdir
     return os.path.basename(os.getcwd())
 
 def cwd_parent():
@@ -122,20 +135,39 @@ def abort(msg=None):
         show(msg)
     sys.exit()
 
-def has_ext(filespec):
-    return os.path.splitext(filespec)[1]
-
+# strip_ext and is_dotted_number are pure and mostly see the same few
+# arguments over and over (the zip name, the version snippet), so cache
+# their results rather than re-scanning the string each call
+@functools.lru_cache(maxsize=4096)
 def strip_ext(filename):
     """
     Example: install.zip ==> install
     """
     return os.path.splitext(filename)[0]
 
+_DOTTED_RE = re.compile(r'\A\d+(?:\.\d+)+\Z')
+
+@functools.lru_cache(maxsize=4096)
 def is_dotted_number(st):
     """
     True value if st of the form "1.1" or "10.1.17" or "10.10.10.10" etc.
     """
-    return st and re.match('^\d+(\.\d+)+$', st) or None
+    return bool(st) and _DOTTED_RE.match(st) is not None
+
+def path_kind(path):
+    """
+    'dir', 'file', or None for a path, from a single stat call instead
+    of separate os.path.isdir/isfile probes.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if stat.S_ISDIR(st.st_mode):
+        return 'dir'
+    if stat.S_ISREG(st.st_mode):
+        return 'file'
+    return None
 
 def fixpath(path):
     """
@@ -144,10 +176,12 @@ def fixpath(path):
     return path.replace("/", os.sep)
 
 def install_file_content(version='VERSION', schema='SCHEMA', file_list=[]):
-    return """
+    file_list_header = "-- file list (might need reordering):" if file_list else ""
+    file_lines = "\n".join(file_list)
+    return f"""
 -- spool output to a logfile
 column spoolfile new_value v_spoolfile
-select 'install-' || sys_context('USERENV','DB_NAME') || '-%s-' || to_char(sysdate,'yyyymmdd') || '.out' as spoolfile
+select 'install-' || sys_context('USERENV','DB_NAME') || '-{version}-' || to_char(sysdate,'yyyymmdd') || '.out' as spoolfile
   from dual;
 spool &v_spoolfile.
 
@@ -159,27 +193,119 @@ set define off;
 set timing on;
 
 -- set the default schema for all scripts
-ALTER SESSION SET CURRENT_SCHEMA=%s;
+ALTER SESSION SET CURRENT_SCHEMA={schema};
 
 -- ***** BEGIN CUSTOM SECTION *****
-%s
-%s
+{file_list_header}
+{file_lines}
 -- ***** END CUSTOM SECTION *****
 
 select 'Ending Install: '||to_char(sysdate, 'yyyy-mm-dd DY hh24:mi:ss')
 as end_script from dual;
 
 spool off;
-    """ % (version,
-           schema,
-           "-- file list (might need reordering):" if file_list else "",
-           "\n".join(file_list))
+    """
+
+DS_STORE = ".DS_Store"
+
+# entries that are already compressed; deflating them again wastes CPU
+STORED_EXTS = {'.jar', '.zip', '.gz', '.png'}
+
+# directory names never worth descending into
+IGNORED_DIRS = {".git", ".svn", "__pycache__", "node_modules"}
+
+def is_relevant_dir(dirspec):
+    name = os.path.basename(dirspec)
+    return not name.startswith(".") \
+        and name not in IGNORED_DIRS \
+        and not dirspec.startswith(fixpath("./install/completed")) \
+        and not dirspec.startswith(fixpath("./install/artifacts"))
 
-def is_relevant_file(filespec):
-    return not filespec.endswith(".DS_Store") \
-        and not filespec.startswith(fixpath("./.git")) \
-        and not filespec.startswith(fixpath("./install/completed/")) \
-        and not filespec.startswith(fixpath("./install/artifacts"))
+def walk_tree(root):
+    """
+    scandir-based replacement for os.walk: yields a DirEntry for every
+    relevant file under root. Directory entries are pruned before descent,
+    and the file/dir distinction comes from the directory entry itself, so
+    no extra stat call is made per file.
+
+    Symlinked directories are never descended, and a (device, inode)
+    set of visited directories guards against cycles from bind mounts
+    or similar, so a pathological tree cannot make the walk loop.
+    """
+    seen_dirs = set()
+    stack = [root]
+    while stack:
+        for entry in os.scandir(stack.pop()):
+            if entry.is_dir(follow_symlinks=False):
+                if is_relevant_dir(entry.path):
+                    st = entry.stat(follow_symlinks=False)
+                    if (st.st_dev, st.st_ino) not in seen_dirs:
+                        seen_dirs.add((st.st_dev, st.st_ino))
+                        stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(DS_STORE):
+                yield entry
+
+class FileTreeIndex:
+    """
+    Lazy basename -> filespec index of the files under root.
+    Nothing is scanned until the first lookup, so runs that never
+    resolve an @-reference never pay for the indexing walk.
+    Duplicate basenames keep the first file found.
+
+    When a fallback root is given, lookups that miss under root retry
+    against a second lazy index of the fallback tree; this lets the
+    primary index cover just the release subtree (where referenced
+    files almost always live) without losing references to files
+    elsewhere in the repository.
+    """
+
+    def __init__(self, root, fallback_root=None):
+        self.root = root
+        self.fallback_root = fallback_root
+        self._index = None
+        self._entries = {}
+        self._fallback = None
+
+    def lookup(self, some_file):
+        if self._index is None:
+            debug("indexing files under %s" % self.root)
+            self._index = {}
+            for entry in walk_tree(self.root):
+                if entry.name in self._index:
+                    debug("duplicate basename %s; keeping %s" % (entry.name, self._index[entry.name]))
+                else:
+                    self._index[entry.name] = entry.path
+                    self._entries[entry.path] = entry
+        found = self._index.get(some_file)
+        if found is None and self.fallback_root is not None:
+            if self._fallback is None:
+                debug("%s not under %s; widening to %s" % (some_file, self.root, self.fallback_root))
+                self._fallback = FileTreeIndex(self.fallback_root)
+            found = self._fallback.lookup(some_file)
+        return found
+
+    def _entry(self, filespec):
+        entry = self._entries.get(filespec)
+        if entry is None and self._fallback is not None:
+            entry = self._fallback._entry(filespec)
+        return entry
+
+    def stat(self, filespec):
+        """
+        stat result for a file, served from its directory entry when the
+        file came out of the indexing walk (DirEntry caches the result,
+        so repeat calls cost nothing).
+        """
+        entry = self._entry(filespec)
+        return entry.stat() if entry is not None else os.stat(filespec)
+
+    def basename(self, filespec):
+        """
+        Basename of a file, taken from its directory entry when possible
+        so indexed files never re-split their path.
+        """
+        entry = self._entry(filespec)
+        return entry.name if entry is not None else os.path.basename(filespec)
 
 def scan_install_path(current_path, expected_path_pattern, expected_file_pattern):
     """
@@ -187,34 +313,45 @@ def scan_install_path(current_path, expected_path_pattern, expected_file_pattern
     look for an install script file matching the expected file pattern (e.g. install-*.sql)
     ensuring it exists somewhere underneath a directory matching the expected path
 
-    return the name of the found script
-           and a list of all the files encountered under current_path (used when generating zip later)
+    return the names of the found scripts
+    (the files they refer to are resolved later through a FileTreeIndex)
     """
 
     script_files = []
-    file_tree = []
     previously_matched_subdir = None
+    # a name can only fnmatch if it ends with the pattern's literal tail
+    # (e.g. ".sql" for install*.sql); checking that first keeps the
+    # fnmatch call off almost every file in the tree
+    literal_tail = expected_file_pattern.rsplit("*", 1)[-1]
+    if any(special in literal_tail for special in "?["):
+        literal_tail = ""
+    # translate the glob to a compiled regex once, instead of going
+    # through fnmatch's cache lookup for every candidate
+    pattern_re = re.compile(fnmatch_translate(expected_file_pattern))
     debug("looking for install script of the pattern: %s" % expected_file_pattern)
-    for path,dirs,files in os.walk(current_path):
-        for filespec in filter(lambda x: is_relevant_file(x), [os.path.join(path, f) for f in files]):
-            debug("  filespec %s" % filespec)
-            file_tree.append(filespec)
-            if fnmatch(os.path.basename(filespec), expected_file_pattern):
-                debug("potential script is %s" % filespec)
-                debug("expected dir pattern is %s" % expected_path_pattern)
-                matching_subdir = find_matching_subdir(filespec, expected_path_pattern)
-                if matching_subdir:
-                    if previously_matched_subdir and matching_subdir != previously_matched_subdir:
-                        show("Skipping duplicate '%s' as it matches '%s', but not '%s'" % \
-                              (matching_subdir, expected_path_pattern, previously_matched_subdir))
-                    else:
-                        script_files.append(filespec)
-                        if not previously_matched_subdir:
-                            show("Building installation for '%s'" % matching_subdir)
-                        previously_matched_subdir = matching_subdir
-                        debug("adding matched subdir (%s)" % matching_subdir)
-
-    return (script_files, file_tree)
+    for entry in walk_tree(current_path):
+        filespec = entry.path
+        # guarded inline: this runs once per file in the tree, so skip
+        # even the debug() call frame when debug is off
+        if _DEBUG:
+            print(f"[DEBUG]   filespec {filespec}")
+        basename = entry.name
+        if basename.endswith(literal_tail) and pattern_re.match(basename):
+            debug("potential script is %s" % filespec)
+            debug("expected dir pattern is %s" % expected_path_pattern)
+            matching_subdir = find_matching_subdir(filespec, expected_path_pattern)
+            if matching_subdir:
+                if previously_matched_subdir and matching_subdir != previously_matched_subdir:
+                    show("Skipping duplicate '%s' as it matches '%s', but not '%s'" % \
+                          (matching_subdir, expected_path_pattern, previously_matched_subdir))
+                else:
+                    script_files.append(filespec)
+                    if not previously_matched_subdir:
+                        show("Building installation for '%s'" % matching_subdir)
+                    previously_matched_subdir = matching_subdir
+                    debug("adding matched subdir (%s)" % matching_subdir)
+
+    return script_files
 
 def find_matching_subdir(filespec, dir_snippet):
     """
@@ -230,23 +367,19 @@ def find_matching_subdir(filespec, dir_snippet):
     """
 
     debug("find_matching_subdir(%s, %s)" % (filespec, dir_snippet))
-    while filespec:
-        (filespec, part) = os.path.split(filespec)
-        debug("trying to find subdir matching %(dir_snippet)s from %(filespec)s,%(part)s" % locals())
-        if not dir_snippet or part == dir_snippet or part.endswith("-%s" % dir_snippet):
-            debug("expected dir found: %(filespec)s/%(part)s" % locals())
+    dashed_snippet = "-%s" % dir_snippet
+    for part in reversed(filespec.split(os.sep)):
+        if not dir_snippet or part == dir_snippet or part.endswith(dashed_snippet):
+            debug("expected dir found: %s" % part)
             return part
     return None
 
-def find_file_in_tree(some_file, file_tree):
+def find_file_in_tree(some_file, tree_index):
     if some_file.startswith(".") or some_file.startswith(fixpath("/")):
         abort("!! Error: relative paths in referenced filenames not supported: %s" % some_file)
-    for filespec in file_tree:
-        #debug("find f:%s fn:%s os.path.basename(f):%s" % (f, fn, os.path.basename(f)))
-        if os.path.basename(filespec) == some_file:
-            return filespec
+    return tree_index.lookup(some_file)
 
-def locate_referred_file(text, file_tree):
+def locate_referred_file(text, tree_index):
     """
     the file specification of a file mentioned in the install script
     e.g. @customer.tab
@@ -254,81 +387,114 @@ def locate_referred_file(text, file_tree):
     filespec = None
     if text.startswith("@"):
         possible_file = text[1:].split()[0]
-        if not has_ext(possible_file):
+        # one scan for a dot in the basename instead of splitext's parsing
+        if "." not in possible_file.rpartition("/")[2]:
             possible_file = "%s.sql" % possible_file
         debug("looking for %s" % possible_file)
-        filespec = find_file_in_tree(possible_file, file_tree)
+        filespec = find_file_in_tree(possible_file, tree_index)
         if not filespec:
             abort("!! Error: could not find file mentioned in the line: %s" % text)
     return filespec
 
-def generate_zip_file(zip_name, install_file, file_tree):
+def generate_zip_file(zip_name, install_file, tree_index):
     message = None
     debug("Install file is: %s" % install_file)
     zipentry_path = os.path.dirname(install_file)
     files_to_include = [install_file]
+    seen = {install_file}
     if not install_file:
         return (None, "Unknown install script")
     else:
-        maybe_show("Zip file %s ..." % zip_name, always=opts.dry_run)
-        try:
-            f = file(install_file, "r")
-            contents = [row.strip() for row in f.readlines()]
-            for row in contents:
-                zip_content_file = locate_referred_file(row, file_tree)
-                if zip_content_file and not zip_content_file in files_to_include:
+        maybe_show("Zip file %s ...", zip_name, always=opts.dry_run)
+        resolved = {}
+        with open(install_file, "r", buffering=131072, encoding="utf-8") as f:
+            for row in f:
+                # only @-rows name files; skip the bulk of the SQL before
+                # doing any further work on the line
+                row = row.lstrip()
+                if not row.startswith("@"):
+                    continue
+                row = row.rstrip()
+                # scripts often reference the same file more than once;
+                # resolve each distinct row a single time
+                if row not in resolved:
+                    resolved[row] = locate_referred_file(row, tree_index)
+                zip_content_file = resolved[row]
+                if zip_content_file and zip_content_file not in seen:
+                    seen.add(zip_content_file)
                     files_to_include.append(zip_content_file)
                     debug("FILE:%s" % zip_content_file)
-        finally:
-            f.close()
-
-        # n.b. with ZipFile(zip_name, "w") as install_zip: (takes care of close)
-        try:
-            install_zip = None
-            if opts.dry_run:
-                message = "Nothing written (dry run)"
-            else:
-                if os.path.isfile(zip_name) and not opts.force_overwrite:
-                    message = "!! File exists: %s; use -F option to overwrite" % zip_name
-                else:
-                    install_zip = ZipFile(zip_name, "w")
-                    message = "File created:"
-            for filename in files_to_include:
-                debug("ZIP file to include: %s" % filename)
-                filespec_in_archive = fixpath("%s/%s" % (zipentry_path, os.path.basename(filename)))
-                maybe_show("... ENTRY: %s" % filespec_in_archive, always=opts.dry_run)
-                if install_zip:
-                    install_zip.write(filename, filespec_in_archive)
-        finally:
-            if install_zip:
-                install_zip.close()
-
-        return (install_zip and install_zip.filename or None, message)
+
+        entries = []
+        entry_lines = []
+        # the archive path prefix is the same for every entry
+        entry_prefix = fixpath(zipentry_path)
+        for filename in files_to_include:
+            debug("ZIP file to include: %s" % filename)
+            filespec_in_archive = f"{entry_prefix}{os.sep}{tree_index.basename(filename)}"
+            entry_lines.append("... ENTRY: %s" % filespec_in_archive)
+            entries.append((filename, filespec_in_archive))
+        # one write for the whole listing instead of a print per entry
+        if entry_lines and (is_verbose() or opts.dry_run):
+            sys.stdout.write("\n".join(entry_lines) + "\n")
+
+        zip_filename = None
+        if opts.dry_run:
+            message = "Nothing written (dry run)"
+        elif path_kind(zip_name) == 'file' and not opts.force_overwrite:
+            message = "!! File exists: %s; use -F option to overwrite" % zip_name
+        else:
+            def load_entry(entry):
+                filename, filespec_in_archive = entry
+                # build the entry from the stat cached at walk time so
+                # ZipFile does not have to stat the source file again
+                st = tree_index.stat(filename)
+                # same arcname normalization ZipFile.write would do
+                arcname = os.path.normpath(filespec_in_archive).lstrip(os.sep)
+                zinfo = ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+                zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+                ext = os.path.splitext(filename)[1].lower()
+                zinfo.compress_type = ZIP_STORED if ext in STORED_EXTS else ZIP_DEFLATED
+                with open(filename, "rb") as source:
+                    return zinfo, source.read()
+
+            with ZipFile(zip_name, "w", compression=ZIP_DEFLATED, compresslevel=6) as install_zip:
+                # read and prep entries in worker threads; map() hands the
+                # results back in order, and only the single-threaded
+                # archive append stays in the main thread
+                with ThreadPoolExecutor(max_workers=min(len(entries), os.cpu_count() or 1) or 1) as pool:
+                    for zinfo, data in pool.map(load_entry, entries):
+                        install_zip.writestr(zinfo, data)
+            zip_filename = install_zip.filename
+            message = "File created:"
+
+        return (zip_filename, message)
 
 def change_to_zip_starting_dir():
+    cwd = os.getcwd()
     for parent_dir_count in range(4):
-        child_dir = os.path.join(os.getcwd(), opts.install_pathname)
-        if os.path.isdir(child_dir):
+        child_dir = os.path.join(cwd, opts.install_pathname)
+        if path_kind(child_dir) == 'dir':
             return
         os.chdir("..")
+        cwd_name.cache_clear()
+        cwd = os.path.dirname(cwd)
     abort("Please run from inside or above the %s directory" % opts.install_pathname)
 
 def write_file(filename, content):
-    if os.path.isfile(filename):
+    if path_kind(filename) == 'file':
         show("File %s already exists" % os.path.abspath(filename))
         if not opts.force_overwrite:
             return
-    try:
-        f = file(filename, 'w')
-        f.writelines(content)
-        show("File created: '%s'" % os.path.abspath(filename))
-    finally:
-        f.close()
+    with open(filename, 'w', encoding="utf-8") as f:
+        f.write(content)
+    show("File created: '%s'" % os.path.abspath(filename))
 
 def filenames_to_include(excepting=None, prefix='@'):
     to_include = []
     if opts.include_list:
-        to_include = ["%s%s" % (prefix, x) for x in glob("*") if x != excepting]
+        to_include = sorted("%s%s" % (prefix, e.name) for e in os.scandir('.')
+                            if e.is_file() and not e.name.startswith('.') and e.name != excepting)
     return to_include
 
 def get_install_script_details():
@@ -378,6 +544,7 @@ def make_and_change_dir(dir=None):
             os.makedirs(dir)
         debug("changing to dir %s" % dir)
         os.chdir(dir)
+        cwd_name.cache_clear()
     if cwd_name() == opts.install_version:
         make_and_change_dir(find_best_numbered_dir())
 
@@ -462,19 +629,23 @@ def build_zip_files():
         abort_not_enough_detail_for_zip()
 
     change_to_zip_starting_dir()
-    (scripts, file_tree) = scan_install_path(".", installation_location, opts.file_template)
-    debug("all files encountered:\n   %s" % "\n  ".join(file_tree))
+    scripts = scan_install_path(".", installation_location, opts.file_template)
     debug("scripts:\n %s" % "\n ".join(scripts))
 
     if not scripts:
         abort_not_found(installation_location)
 
+    # referenced files nearly always sit beside the scripts, so index the
+    # release subtree first and only widen to the whole tree on a miss
+    index_root = os.path.commonpath([os.path.dirname(script) for script in scripts])
+    tree_index = FileTreeIndex(index_root or ".", fallback_root=".")
+
     artifacts_dir = "%s/artifacts" % opts.install_pathname
     if not os.path.exists(artifacts_dir):
         os.makedirs(artifacts_dir)
 
     for script in scripts:
-        (zip_file, message) = generate_zip_file(generate_zip_filespec(script, artifacts_dir), script, file_tree)
+        (zip_file, message) = generate_zip_file(generate_zip_filespec(script, artifacts_dir), script, tree_index)
         if message:
             show(message)
         if zip_file:
@@ -486,6 +657,7 @@ if __name__ == "__main__":
 # ________________________ 
 
     opts = read_options()
+    _DEBUG = opts.debug_enabled
     if opts.build_install_script:
         build_install_script_boiler_plate_file()
     else: